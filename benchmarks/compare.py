@@ -0,0 +1,106 @@
+"""
+Compare two ``benchmarks.endpoints`` reports and exit with status 1 when a
+metric regressed by more than its threshold:
+
+    python -m benchmarks.compare base.json head.json --threshold 0.1 \\
+        --limit p99_ms=0.25
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is a regression. Throughput is the reverse.
+LOWER_IS_BETTER = [
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "peak_rss_kib",
+    "alloc_kib_per_request",
+]
+HIGHER_IS_BETTER = ["throughput_rps"]
+
+
+def change(metric, base, head):
+    """
+    Relative change of ``metric``, positive when ``head`` is worse.
+    """
+    if not base:
+        return 0.0
+    if metric in HIGHER_IS_BETTER:
+        return (base - head) / abs(base)
+    return (head - base) / abs(base)
+
+
+def compare(base, head, thresholds):
+    """
+    Return ``(mode, route, metric, base, head, change, regressed)`` rows for
+    every metric present in both reports.
+    """
+    rows = []
+    for mode, routes in head["results"].items():
+        for route, metrics in routes.items():
+            base_metrics = base["results"].get(mode, {}).get(route)
+            if base_metrics is None:
+                continue
+            for metric, threshold in thresholds.items():
+                if metric not in metrics or metric not in base_metrics:
+                    continue
+                delta = change(metric, base_metrics[metric], metrics[metric])
+                rows.append(
+                    (
+                        mode,
+                        route,
+                        metric,
+                        base_metrics[metric],
+                        metrics[metric],
+                        delta,
+                        delta > threshold,
+                    )
+                )
+    return rows
+
+
+def parse_limit(value):
+    metric, _, threshold = value.partition("=")
+    if metric not in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+        raise argparse.ArgumentTypeError(f"unknown metric {metric}")
+    return metric, float(threshold)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed relative regression for every metric",
+    )
+    parser.add_argument(
+        "--limit",
+        type=parse_limit,
+        action="append",
+        default=[],
+        help="per-metric threshold, e.g. p99_ms=0.25",
+    )
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    thresholds = {
+        metric: args.threshold
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER
+    }
+    thresholds.update(args.limit)
+
+    rows = compare(base, head, thresholds)
+    for mode, route, metric, old, new, delta, regressed in rows:
+        print(
+            f"{'FAIL' if regressed else 'ok':<5}{mode:<10} {route:<15} "
+            f"{metric:<24} {old:>10.2f} -> {new:>10.2f} ({delta:+.1%})"
+        )
+    sys.exit(1 if any(row[-1] for row in rows) else 0)
@@ -0,0 +1,326 @@
+"""
+Load and latency benchmark for every users endpoint, run both in-process
+against the ASGI app and through Mangum with API Gateway events.
+
+Mailgun is stubbed with requests-mock and DynamoDB is DynamoDB Local:
+
+    docker run -p 8000:8000 amazon/dynamodb-local
+    DYNAMODB_HOST=http://localhost:8000 python -m benchmarks.endpoints \\
+        --output bench.json
+
+Every route runs in a process of its own against a table created for the
+run, with the email filter off. Compare two runs with
+``python -m benchmarks.compare``.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+import requests_mock
+from benchmarks.local import require_local_dynamodb, run_table, use_run_table
+
+# A fresh table per run, shared with the route processes through the env.
+use_run_table()
+os.environ["EMAIL_FILTER"] = "false"
+os.environ.setdefault("JWT_SECRET", "benchmark")
+os.environ.setdefault("MAILGUN_API_KEY", "benchmark")
+os.environ.setdefault("MAILGUN_BASE_URL", "https://mailgun.invalid/v3")
+# Send emails so the Mailgun request path is measured against the stub.
+os.environ.pop("SEND_EMAILS", None)
+
+from src import db  # noqa: E402
+from src.main import app, handler  # noqa: E402
+
+PASSWORD = "benchmark"
+ROUTES = ["/users/signup", "/users/login", "/token/verify", "/token/refresh"]
+
+
+def signup_body():
+    return {
+        "email": f"bench-{uuid.uuid4().hex}@example.com",
+        "password": PASSWORD,
+        "first_name": "John",
+        "last_name": "Doe",
+        "account_type": 2,
+    }
+
+
+def request_body(route, user):
+    """
+    Body of the next request to ``route``. ``user`` is the signup response
+    of a seeded user, refreshed before each route run.
+    """
+    if route == "/users/signup":
+        return signup_body()
+    if route == "/users/login":
+        return {"email": user["user"]["email"], "password": PASSWORD}
+    if route == "/token/verify":
+        return {"token": user["access_token"]}
+    if route == "/token/refresh":
+        return {"token": user["refresh_token"]}
+    raise ValueError(route)
+
+
+async def call_asgi(path, body):
+    payload = json.dumps(body).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"benchmark"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    messages = [{"type": "http.request", "body": payload}]
+    response = {"body": b""}
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        else:
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["body"]
+
+
+def api_gateway_event(path, body):
+    payload = json.dumps(body)
+    headers = {"content-type": "application/json", "host": "benchmark"}
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "POST",
+        "headers": headers,
+        "multiValueHeaders": {k: [v] for k, v in headers.items()},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": "POST",
+            "path": path,
+            "stage": "benchmark",
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": payload,
+        "isBase64Encoded": False,
+    }
+
+
+def call_mangum(path, body):
+    response = handler(
+        api_gateway_event(path, body),
+        SimpleNamespace(function_name="benchmark"),
+    )
+    return response["statusCode"], response["body"].encode()
+
+
+def check(route, status, body):
+    if status != 200:
+        raise RuntimeError(f"{route} returned {status}: {body[:200]}")
+    return json.loads(body)
+
+
+class InProcess:
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.loop = asyncio.get_event_loop()
+
+    def once(self, route, body):
+        status, content = self.loop.run_until_complete(call_asgi(route, body))
+        return check(route, status, content)
+
+    def run(self, route, user, requests):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        latencies = []
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                status, content = await call_asgi(
+                    route, request_body(route, user)
+                )
+                latencies.append(time.perf_counter() - start)
+                check(route, status, content)
+
+        async def run_all():
+            await asyncio.gather(*(one() for _ in range(requests)))
+
+        start = time.perf_counter()
+        self.loop.run_until_complete(run_all())
+        return latencies, time.perf_counter() - start
+
+
+class ThroughMangum:
+    # Lambda hands a container one event at a time, so no concurrency here.
+    def once(self, route, body):
+        return check(route, *call_mangum(route, body))
+
+    def run(self, route, user, requests):
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(requests):
+            request_start = time.perf_counter()
+            self.once(route, request_body(route, user))
+            latencies.append(time.perf_counter() - request_start)
+        return latencies, time.perf_counter() - start
+
+
+def allocations(runner, route, user, samples):
+    """
+    Median over ``samples`` requests of the peak memory allocated while
+    serving one request, in KiB. Traces are cleared before every request,
+    so memory allocated before it is not counted.
+    """
+    peaks = []
+    tracemalloc.start()
+    for _ in range(samples):
+        body = request_body(route, user)
+        tracemalloc.clear_traces()
+        runner.once(route, body)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    return statistics.median(peaks) / 1024
+
+
+def peak_rss_kib():
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss // 1024 if platform.system() == "Darwin" else maxrss
+
+
+def run_route(mode, route, options):
+    """
+    Benchmark one route in the current process. Run in a process of its
+    own so peak RSS belongs to that route alone.
+    """
+    if mode == "inprocess":
+        runner = InProcess(options["concurrency"])
+    else:
+        runner = ThroughMangum()
+
+    with requests_mock.Mocker() as mailgun:
+        mailgun.post(requests_mock.ANY, json={"message": "Queued"})
+        user = runner.once("/users/signup", signup_body())
+        for _ in range(options["warmup"]):
+            runner.once(route, request_body(route, user))
+        latencies, elapsed = runner.run(route, user, options["requests"])
+        alloc_kib = allocations(runner, route, user, options["alloc_samples"])
+    asyncio.get_event_loop().run_until_complete(db.close_client())
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentiles[49] * 1000,
+        "p95_ms": percentiles[94] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "peak_rss_kib": peak_rss_kib(),
+        "alloc_kib_per_request": alloc_kib,
+    }
+
+
+def run_route_process(mode, route, options):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as executor:
+        return executor.submit(run_route, mode, route, options).result()
+
+
+def commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(
+        f"{'mode':<10} {'route':<15} {'rps':>9} {'p50 ms':>9} "
+        f"{'p95 ms':>9} {'p99 ms':>9} {'rss KiB':>9} {'KiB/req':>9}"
+    )
+    for mode, routes in results.items():
+        for route, r in routes.items():
+            print(
+                f"{mode:<10} {route:<15} {r['throughput_rps']:>9.1f} "
+                f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+                f"{r['p99_ms']:>9.2f} {r['peak_rss_kib']:>9} "
+                f"{r['alloc_kib_per_request']:>9.2f}"
+            )
+
+
+def main(args):
+    options = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "alloc_samples": args.alloc_samples,
+    }
+    with run_table():
+        results = {
+            mode: {
+                route: run_route_process(mode, route, options)
+                for route in args.routes
+            }
+            for mode in args.modes
+        }
+
+    print_results(results)
+    report = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--alloc-samples", type=int, default=20)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["inprocess", "mangum"],
+        choices=["inprocess", "mangum"],
+    )
+    parser.add_argument("--routes", nargs="+", default=ROUTES, choices=ROUTES)
+    parser.add_argument("--output", help="write the JSON report to a file")
+    args = parser.parse_args()
+
+    require_local_dynamodb(parser)
+    main(args)
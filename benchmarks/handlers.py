@@ -0,0 +1,238 @@
+"""
+Requests/sec of the users handlers served by uvicorn, for one or more git
+refs (e.g. the sync handlers before the async data layer against HEAD):
+
+    docker run -p 8000:8000 amazon/dynamodb-local
+    DYNAMODB_HOST=http://localhost:8000 python -m benchmarks.handlers \\
+        --refs 622336f HEAD --concurrency 1000
+
+Each ref is checked out in a temporary worktree and served by a single
+uvicorn worker. PynamoDB is pointed at DYNAMODB_HOST through a settings
+file, so refs without ``Users.Meta.host`` also use the local DynamoDB.
+``--dynamodb-latency-ms`` puts ``benchmarks.latency_proxy`` in between to
+simulate the round trips of a regional DynamoDB endpoint.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+import aiohttp
+from benchmarks.local import require_local_dynamodb, run_table, use_run_table
+
+# A fresh table per run, passed to the servers through the env.
+use_run_table()
+
+PASSWORD = "benchmark"
+SCENARIOS = {
+    # One GetItem per request and no password hashing.
+    "login-unknown": ("/users/login", 404),
+    "refresh": ("/token/refresh", 200),
+}
+
+
+@contextmanager
+def worktree(ref):
+    path = tempfile.mkdtemp(prefix="users-api-")
+    subprocess.run(
+        ["git", "worktree", "add", "--detach", path, ref],
+        check=True,
+        capture_output=True,
+    )
+    try:
+        yield path
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", path])
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def latency_proxy(latency_ms, port):
+    if not latency_ms:
+        yield os.environ["DYNAMODB_HOST"]
+        return
+    proxy = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.latency_proxy",
+            "--port",
+            str(port),
+            "--upstream",
+            os.environ["DYNAMODB_HOST"],
+            "--latency-ms",
+            str(latency_ms),
+        ]
+    )
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        proxy.terminate()
+        proxy.wait()
+
+
+@contextmanager
+def serve(path, port, dynamodb_host):
+    settings = os.path.join(path, "pynamodb_settings.py")
+    with open(settings, "w") as f:
+        f.write(f"host = {dynamodb_host!r}\n")
+    env = {
+        **os.environ,
+        "DYNAMODB_HOST": dynamodb_host,
+        "PYNAMODB_CONFIG": settings,
+        "SEND_EMAILS": "false",
+        "EMAIL_FILTER": "false",
+        "JWT_SECRET": "benchmark",
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            # Outlive client requests queued behind 1,000 in-flight ones.
+            "--timeout-keep-alive",
+            "300",
+        ],
+        cwd=path,
+        env=env,
+    )
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def wait_until_up(session, url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(url + "/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientConnectionError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{url} did not start")
+        await asyncio.sleep(0.2)
+
+
+async def seed_user(session, url):
+    body = {
+        "email": f"bench-{uuid.uuid4().hex}@example.com",
+        "password": PASSWORD,
+        "first_name": "John",
+        "last_name": "Doe",
+        "account_type": 2,
+    }
+    async with session.post(url + "/users/signup", json=body) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+def request_body(scenario, user):
+    if scenario == "login-unknown":
+        email = f"unknown-{uuid.uuid4().hex}@example.com"
+        return {"email": email, "password": PASSWORD}
+    return {"token": user["refresh_token"]}
+
+
+async def load(session, url, scenario, user, requests, concurrency):
+    path, expected = SCENARIOS[scenario]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async with session.post(
+                    url + path, json=request_body(scenario, user)
+                ) as response:
+                    await response.read()
+                    ok = response.status == expected
+            except aiohttp.ClientError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "errors": errors,
+    }
+
+
+async def benchmark(url, scenarios, requests, concurrency):
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout
+    ) as session:
+        await wait_until_up(session, url)
+        user = await seed_user(session, url)
+        results = {}
+        for scenario in scenarios:
+            # Warm up connections, the DynamoDB client and code paths.
+            await load(session, url, scenario, user, concurrency, concurrency)
+            results[scenario] = await load(
+                session, url, scenario, user, requests, concurrency
+            )
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refs", nargs="+", default=["HEAD"])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--dynamodb-latency-ms", type=float, default=0)
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=list(SCENARIOS),
+        choices=list(SCENARIOS),
+    )
+    args = parser.parse_args()
+
+    require_local_dynamodb(parser)
+
+    print(
+        f"{'ref':<10} {'scenario':<14} {'rps':>8} {'p50 ms':>9} "
+        f"{'p99 ms':>9} {'errors':>7}"
+    )
+    with run_table():
+        for ref in args.refs:
+            with worktree(ref) as path, latency_proxy(
+                args.dynamodb_latency_ms, args.port + 1
+            ) as dynamodb_host, serve(path, args.port, dynamodb_host) as url:
+                results = asyncio.get_event_loop().run_until_complete(
+                    benchmark(
+                        url, args.scenarios, args.requests, args.concurrency
+                    )
+                )
+            for scenario, r in results.items():
+                print(
+                    f"{ref:<10} {scenario:<14} {r['rps']:>8.1f} "
+                    f"{r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+                    f"{r['errors']:>7}"
+                )
@@ -0,0 +1,57 @@
+"""
+TCP proxy adding a fixed delay to every request sent to a local DynamoDB,
+so benchmarks see network round trips like a regional DynamoDB endpoint:
+
+    python -m benchmarks.latency_proxy --port 8001 \\
+        --upstream http://localhost:8000 --latency-ms 10
+"""
+import argparse
+import asyncio
+from urllib.parse import urlparse
+
+
+async def pipe(reader, writer, delay):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            if delay:
+                await asyncio.sleep(delay)
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def main(port, upstream, latency):
+    url = urlparse(upstream)
+
+    async def handle(client_reader, client_writer):
+        try:
+            reader, writer = await asyncio.open_connection(
+                url.hostname, url.port
+            )
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(
+            pipe(client_reader, writer, latency),
+            pipe(reader, client_writer, 0),
+        )
+
+    server = await asyncio.start_server(handle, "127.0.0.1", port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--upstream", default="http://localhost:8000")
+    parser.add_argument("--latency-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.port, args.upstream, args.latency_ms / 1000))
@@ -0,0 +1,41 @@
+import os
+import uuid
+from contextlib import contextmanager
+
+
+def use_run_table():
+    """
+    Point USERS_TABLE at ``BENCHMARK_USERS_TABLE``, by default a table named
+    for this run. Call it before importing src, whose models read the table
+    name at import time. Child processes inherit it through the env.
+    """
+    os.environ.setdefault(
+        "BENCHMARK_USERS_TABLE",
+        f"example-users-benchmark-{uuid.uuid4().hex[:8]}",
+    )
+    os.environ["USERS_TABLE"] = os.environ["BENCHMARK_USERS_TABLE"]
+
+
+def require_local_dynamodb(parser):
+    if not os.environ.get("DYNAMODB_HOST"):
+        parser.error("DYNAMODB_HOST must point to a local DynamoDB")
+
+
+@contextmanager
+def run_table():
+    """
+    Create the users table for the run, and delete it afterwards only if it
+    did not exist before.
+    """
+    from src.models import Users
+
+    created = not Users.exists()
+    if created:
+        Users.create_table(
+            read_capacity_units=1, write_capacity_units=1, wait=True
+        )
+    try:
+        yield
+    finally:
+        if created:
+            Users.delete_table()
@@ -0,0 +1,67 @@
+"""
+Tokens/sec of the access/refresh pair minted with the keyring
+(``issue_tokens``) against the previous ``jwt.encode`` helpers:
+
+    python -m benchmarks.tokens
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import jwt
+from src.helpers import issue_tokens
+
+USER = {
+    "id": "8e1b6d3a-4f4c-4a53-9d2f-0c3b7f1a2e9d",
+    "email": "benchmark@example.com",
+    "account_type": 2,
+    "first_name": "John",
+    "last_name": "Doe",
+    "phone": "",
+    "cif": "",
+    "city": "",
+    "address": "",
+    "created_at": 1650000000.0,
+    "modified": 1650000000.0,
+    "utms": {},
+}
+
+
+def legacy_jwt(data):
+    secret = os.environ.get("JWT_SECRET")
+    return jwt.encode(data, secret, algorithm="HS256")
+
+
+def legacy_tokens(data):
+    access = dict(data)
+    access["exp"] = datetime.now(tz=timezone.utc) + timedelta(minutes=1)
+    refresh = {
+        "id": data["id"],
+        "email": data["email"],
+        "exp": datetime.now(tz=timezone.utc) + timedelta(days=30),
+        "refresh_token": True,
+    }
+    return {
+        "access_token": legacy_jwt(access),
+        "refresh_token": legacy_jwt(refresh),
+    }
+
+
+def tokens_per_second(mint, pairs):
+    start = time.perf_counter()
+    for _ in range(pairs):
+        mint(USER)
+    return 2 * pairs / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=20000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("JWT_SECRET", "benchmark")
+    minters = {"jwt.encode": legacy_tokens, "keyring": issue_tokens}
+    for name, mint in minters.items():
+        mint(USER)
+        rate = tokens_per_second(mint, args.pairs)
+        print(f"{name:>10}: {rate:10.0f} tokens/sec")
@@ -1,50 +1,58 @@
 import datetime
 import uuid
-import jwt
 from src.models import Users
 from pynamodb.exceptions import DoesNotExist
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from src import db
+from src.bloom import emails
+from src.profiles import profiles
 from src.auth import make_password, check_password
 from src.helpers import (
-    create_jwt,
     send_email,
     decode_token,
-    create_access_token,
-    create_refresh_token,
     create_verification_token,
+    issue_tokens,
 )
 
 
-def create_user(data: dict):
-    try:
-        Users.get(hash_key=data["email"])
-        raise HTTPException(status_code=409, detail="User already exists")
-    except DoesNotExist:
-        pass
+async def create_user(data: dict):
+    if emails.might_exist(data["email"]):
+        try:
+            await db.get_user(data["email"])
+            raise HTTPException(status_code=409, detail="User already exists")
+        except DoesNotExist:
+            pass
 
     try:
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
         user = Users(
             id=str(uuid.uuid4()),
             account_type=data["account_type"],
             email=data["email"],
             first_name=data["first_name"],
             last_name=data["last_name"],
-            password=make_password(data["password"]),
+            password=await run_in_threadpool(make_password, data["password"]),
             phone=data.get("phone", ""),
             cif=data.get("cif", ""),
             city=data.get("city", ""),
             address=data.get("address", ""),
-            created_at=datetime.datetime.now().timestamp(),
-            modified=datetime.datetime.now().timestamp(),
+            created_at=now.timestamp(),
+            created_day=now.strftime("%Y-%m-%d"),
+            modified=now.timestamp(),
             utms=data.get("utms", {}),
         )
-        user.save()
+        if not await db.create_user(user):
+            raise HTTPException(status_code=409, detail="User already exists")
     except KeyError:
         raise HTTPException(status_code=400, detail="Missing required fields")
     else:
+        emails.add(user.email)
         user = user.to_dict()
         user.pop("password")
-        response = send_email(
+        profiles.put(user)
+        await run_in_threadpool(
+            send_email,
             to=user["email"],
             subject="Welcome to Example",
             template="welcome",
@@ -52,36 +60,36 @@ def create_user(data: dict):
         )
         return {
             "user": user,
-            "access_token": create_access_token(user),
-            "refresh_token": create_refresh_token(user),
+            **issue_tokens(user),
         }
 
 
-def login_user(data: dict):
+async def login_user(data: dict):
     try:
         email = data["email"]
         password = data["password"]
-        user = Users.get(hash_key=email)
+        user = await db.get_user(email)
     except KeyError:
         raise HTTPException(status_code=400, detail="Missing required fields")
     except DoesNotExist:
         raise HTTPException(status_code=404, detail="User does not exist")
     else:
         user = user.to_dict()
-        if check_password(password, user["password"]):
+        if await run_in_threadpool(check_password, password, user["password"]):
             user.pop("password")
+            profiles.put(user)
             return {
                 "user": user,
-                "access_token": create_access_token(user),
-                "refresh_token": create_refresh_token(user),
+                **issue_tokens(user),
             }
         else:
             raise HTTPException(status_code=401, detail="Invalid password")
 
 
-def reset_password_email(data: dict):
+async def reset_password_email(data: dict):
     token = create_verification_token(email=data["email"])
-    send_email(
+    await run_in_threadpool(
+        send_email,
         to=data["email"],
         subject="Reset your password",
         template="reset-password",
@@ -89,7 +97,7 @@ def reset_password_email(data: dict):
     )
 
 
-def reset_password(data: dict):
+async def reset_password(data: dict):
     token = decode_token(data["token"])
     if not token:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -98,43 +106,51 @@ def reset_password(data: dict):
         raise HTTPException(status_code=400, detail="Invalid token")
 
     try:
-        user = Users.get(hash_key=token["email"])
+        user = await db.get_user(token["email"])
     except KeyError:
         raise HTTPException(status_code=400, detail="Missing required fields")
     except DoesNotExist:
         raise HTTPException(status_code=404, detail="User does not exist")
     else:
-        user.password = make_password(data["password"])
-        user.save()
+        user.password = await run_in_threadpool(
+            make_password, data["password"]
+        )
+        user.modified = datetime.datetime.now(
+            tz=datetime.timezone.utc
+        ).timestamp()
+        await db.save_user(user)
         user = user.to_dict()
         user.pop("password")
+        profiles.put(user)
         return {
             "user": user,
-            "access_token": create_access_token(user),
-            "refresh_token": create_refresh_token(user),
+            **issue_tokens(user),
         }
 
 
-def verify_token(token: str):
+async def verify_token(token: str):
     return decode_token(token)
 
 
-def refresh_token(token: str):
+async def refresh_token(token: str):
     token = decode_token(token)
     if not token or "refresh_token" not in token or not token["refresh_token"]:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    try:
-        user = Users.get(hash_key=token["email"])
-    except KeyError:
+    if "email" not in token:
         raise HTTPException(status_code=400, detail="Missing required fields")
-    except DoesNotExist:
-        raise HTTPException(status_code=404, detail="User does not exist")
-    else:
+
+    user = profiles.get(token["email"], token.get("modified"))
+    if user is None:
+        try:
+            user = await db.get_user(token["email"])
+        except DoesNotExist:
+            raise HTTPException(status_code=404, detail="User does not exist")
         user = user.to_dict()
         user.pop("password")
-        return {
-            "user": user,
-            "access_token": create_access_token(user),
-            "refresh_token": create_refresh_token(user),
-        }
+        profiles.put(user)
+
+    return {
+        "user": user,
+        **issue_tokens(user),
+    }
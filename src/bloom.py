@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from starlette.concurrency import run_in_threadpool
+from src import db
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """
+    Probabilistic set of strings. ``might_contain`` never returns False for
+    an added value, and returns True for a missing one with probability
+    ``error_rate`` once ``capacity`` values have been added.
+
+    Size is ``-capacity * ln(error_rate) / ln(2)^2`` bits: for 10M values at
+    a 1% error rate that is ~95.9M bits (~11.4 MiB) and 7 hashes.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Double hashing (Kirsch-Mitzenmacher) from a single 128-bit digest.
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        self.add_many((value,))
+
+    def add_many(self, values):
+        bits, size, hashes = self.bits, self.size, self.hashes
+        blake2b = hashlib.blake2b
+        for value in values:
+            digest = blake2b(value.encode(), digest_size=16).digest()
+            h1 = int.from_bytes(digest[:8], "little")
+            h2 = int.from_bytes(digest[8:], "little") | 1
+            for i in range(hashes):
+                position = (h1 + i * h2) % size
+                bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, value):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+    def __contains__(self, value):
+        return self.might_contain(value)
+
+
+class EmailFilter:
+    """
+    Per-container filter of registered emails, used by signup to skip the
+    duplicate check read for emails that are definitely not registered.
+    Signup writes with a conditional put, so a stale filter cannot create
+    duplicates. Login does not use it: a signup from another container is
+    only known here after the next refresh.
+
+    Opt-in with ``EMAIL_FILTER=true``. The filter is bulk loaded in the
+    background with a parallel scan, then refreshed every
+    ``refresh_seconds`` by querying ``Users.created_day_index`` for the
+    users created since the previous load. Until the first load completes
+    every email is reported as possibly registered. A failed load is logged
+    and only retried ``refresh_seconds`` later.
+    """
+
+    def __init__(
+        self, capacity, error_rate, segments, refresh_seconds, enabled=False
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.segments = segments
+        self.refresh_seconds = refresh_seconds
+        self.enabled = enabled
+        self._task = None
+        self.reset()
+
+    def reset(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._task = None
+        self.loaded_at = None
+        self.failed_at = None
+        # ~11.4 MiB at 10M users, only allocated when the filter is used.
+        self.filter = (
+            BloomFilter(self.capacity, self.error_rate)
+            if self.enabled
+            else None
+        )
+
+    def add(self, email):
+        if self.filter is not None:
+            self.filter.add(email)
+
+    async def _add_page(self, emails):
+        # Hashing a page takes milliseconds, keep it off the event loop.
+        await run_in_threadpool(self.filter.add_many, emails)
+
+    async def _load(self, created_since):
+        started_at = time.time()
+        try:
+            if created_since is None:
+                await db.scan_emails(self._add_page, self.segments)
+            else:
+                await db.query_emails_created_since(
+                    self._add_page, created_since
+                )
+        except Exception:
+            logger.exception(
+                "Email filter load failed, retrying in %ss",
+                self.refresh_seconds,
+            )
+            self.failed_at = time.time()
+        else:
+            self.loaded_at = started_at
+            self.failed_at = None
+
+    def _schedule(self):
+        if self._task is not None and not self._task.done():
+            return
+        if (
+            self.failed_at is not None
+            and time.time() - self.failed_at <= self.refresh_seconds
+        ):
+            return
+        if self.loaded_at is None:
+            self._task = asyncio.ensure_future(self._load(None))
+        elif time.time() - self.loaded_at > self.refresh_seconds:
+            # Overlap by a second so items written mid-load are not missed.
+            self._task = asyncio.ensure_future(self._load(self.loaded_at - 1))
+
+    def might_exist(self, email):
+        """
+        Return False only if ``email`` is definitely not registered.
+        """
+        if not self.enabled:
+            return True
+        self._schedule()
+        if self.loaded_at is None:
+            return True
+        return email in self.filter
+
+
+emails = EmailFilter(
+    capacity=int(os.environ.get("EMAIL_FILTER_CAPACITY", 10_000_000)),
+    error_rate=float(os.environ.get("EMAIL_FILTER_ERROR_RATE", 0.01)),
+    segments=int(os.environ.get("EMAIL_FILTER_SCAN_SEGMENTS", 8)),
+    refresh_seconds=int(os.environ.get("EMAIL_FILTER_REFRESH_SECONDS", 300)),
+    enabled=os.environ.get("EMAIL_FILTER", "false").lower() == "true",
+)
@@ -1 +1,13 @@
-DEFAULT_JWT_SECRET = "secret"
+DEFAULT_JWT_KID = "default"
+
+DEFAULT_ACCESS_TOKEN_MINUTES = 1
+DEFAULT_REFRESH_TOKEN_DAYS = 30
+DEFAULT_VERIFICATION_TOKEN_MINUTES = 5
+
+# Claims copied from the user into access tokens, per ACCESS_TOKEN_CLAIMS.
+# None copies the whole user.
+ACCESS_TOKEN_CLAIMS = {
+    "full": None,
+    "minimal": ("id", "email", "account_type", "modified"),
+}
+DEFAULT_ACCESS_TOKEN_CLAIMS = "full"
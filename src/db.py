@@ -0,0 +1,148 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+from pynamodb.exceptions import DoesNotExist
+from src.models import Users
+
+
+MAX_POOL_CONNECTIONS = int(
+    os.environ.get("DYNAMODB_MAX_POOL_CONNECTIONS", 100)
+)
+
+# One client (and connection pool) per event loop. Lambda containers and
+# uvicorn workers run a single loop, the test client may run others.
+_clients = {}
+
+
+async def _create_client():
+    session = get_session()
+    context = session.create_client(
+        "dynamodb",
+        region_name=Users.Meta.region,
+        endpoint_url=Users.Meta.host,
+        config=AioConfig(max_pool_connections=MAX_POOL_CONNECTIONS),
+    )
+    return context, await context.__aenter__()
+
+
+async def get_client():
+    """
+    Return the shared DynamoDB client of the running event loop, creating
+    it on first use. Concurrent callers await the same creation task, a
+    failed creation is forgotten so the next call retries it.
+    """
+    loop = asyncio.get_event_loop()
+    if loop not in _clients:
+        _clients[loop] = asyncio.ensure_future(_create_client())
+    task = _clients[loop]
+    try:
+        _, client = await task
+    except Exception:
+        if _clients.get(loop) is task:
+            del _clients[loop]
+        raise
+    return client
+
+
+async def close_client():
+    loop = asyncio.get_event_loop()
+    task = _clients.pop(loop, None)
+    if task is not None:
+        context, _ = await task
+        await context.__aexit__(None, None, None)
+
+
+async def get_user(email: str):
+    """
+    Async equivalent of ``Users.get(hash_key=email)``.
+    """
+    client = await get_client()
+    response = await client.get_item(
+        TableName=Users.Meta.table_name,
+        Key={"email": {"S": email}},
+    )
+    if "Item" not in response:
+        raise DoesNotExist()
+    return Users.from_raw_data(response["Item"])
+
+
+async def save_user(user: Users):
+    """
+    Async equivalent of ``user.save()``.
+    """
+    client = await get_client()
+    await client.put_item(
+        TableName=Users.Meta.table_name,
+        Item=user.serialize(),
+    )
+    return user
+
+
+async def create_user(user: Users):
+    """
+    Save ``user`` only if its email is not registered yet. Return False when
+    it already exists, so duplicates are caught by DynamoDB itself.
+    """
+    client = await get_client()
+    try:
+        await client.put_item(
+            TableName=Users.Meta.table_name,
+            Item=user.serialize(),
+            ConditionExpression="attribute_not_exists(email)",
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return False
+        raise
+    return True
+
+
+async def scan_emails(callback, segments: int):
+    """
+    Parallel scan awaiting ``callback(emails)`` with the emails of every
+    page of the table.
+    """
+    client = await get_client()
+
+    async def scan_segment(segment):
+        paginator = client.get_paginator("scan")
+        async for page in paginator.paginate(
+            TableName=Users.Meta.table_name,
+            ProjectionExpression="email",
+            Segment=segment,
+            TotalSegments=segments,
+        ):
+            await callback([item["email"]["S"] for item in page["Items"]])
+
+    await asyncio.gather(
+        *(scan_segment(segment) for segment in range(segments))
+    )
+
+
+async def query_emails_created_since(callback, created_since: float):
+    """
+    Await ``callback(emails)`` with the emails of the users created at or
+    after ``created_since``, read from ``created_day_index`` one UTC day
+    at a time so only those users are read.
+    """
+    client = await get_client()
+    day = datetime.fromtimestamp(created_since, tz=timezone.utc).date()
+    today = datetime.now(tz=timezone.utc).date()
+    while day <= today:
+        paginator = client.get_paginator("query")
+        async for page in paginator.paginate(
+            TableName=Users.Meta.table_name,
+            IndexName=Users.created_day_index.Meta.index_name,
+            KeyConditionExpression=(
+                "created_day = :day AND created_at >= :since"
+            ),
+            ExpressionAttributeValues={
+                ":day": {"S": day.isoformat()},
+                ":since": {"N": str(created_since)},
+            },
+        ):
+            await callback([item["email"]["S"] for item in page["Items"]])
+        day += timedelta(days=1)
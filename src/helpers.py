@@ -5,39 +5,98 @@ from datetime import datetime, timezone, timedelta
 import boto3
 import jwt
 import base64
-from src.constants import DEFAULT_JWT_SECRET
+from src.constants import (
+    ACCESS_TOKEN_CLAIMS,
+    DEFAULT_ACCESS_TOKEN_CLAIMS,
+    DEFAULT_ACCESS_TOKEN_MINUTES,
+    DEFAULT_REFRESH_TOKEN_DAYS,
+    DEFAULT_VERIFICATION_TOKEN_MINUTES,
+)
 from botocore.exceptions import ClientError
+from src.keyring import get_keyring
 
 
 def get_env(key):
     return os.environ.get(key)
 
 
-def create_access_token(data: dict):
-    data["exp"] = datetime.now(tz=timezone.utc) + timedelta(minutes=1)
-    return create_jwt(data)
+def access_token_claims(profile: str):
+    """
+    Claims copied into access tokens for a ``ACCESS_TOKEN_CLAIMS`` profile.
+    """
+    if profile not in ACCESS_TOKEN_CLAIMS:
+        raise ValueError(
+            f"ACCESS_TOKEN_CLAIMS must be one of "
+            f"{', '.join(ACCESS_TOKEN_CLAIMS)}, got {profile!r}"
+        )
+    return ACCESS_TOKEN_CLAIMS[profile]
+
+
+ACCESS_TOKEN_CLAIM_KEYS = access_token_claims(
+    os.environ.get("ACCESS_TOKEN_CLAIMS", DEFAULT_ACCESS_TOKEN_CLAIMS)
+)
+ACCESS_TOKEN_LIFETIME = timedelta(
+    minutes=float(
+        os.environ.get("ACCESS_TOKEN_MINUTES", DEFAULT_ACCESS_TOKEN_MINUTES)
+    )
+)
+REFRESH_TOKEN_LIFETIME = timedelta(
+    days=float(
+        os.environ.get("REFRESH_TOKEN_DAYS", DEFAULT_REFRESH_TOKEN_DAYS)
+    )
+)
+VERIFICATION_TOKEN_LIFETIME = timedelta(
+    minutes=float(
+        os.environ.get(
+            "VERIFICATION_TOKEN_MINUTES", DEFAULT_VERIFICATION_TOKEN_MINUTES
+        )
+    )
+)
 
 
-def create_refresh_token(data: dict):
+def access_token_data(data: dict, now: datetime):
+    if ACCESS_TOKEN_CLAIM_KEYS is None:
+        tokenData = dict(data)
+    else:
+        tokenData = {
+            key: data[key] for key in ACCESS_TOKEN_CLAIM_KEYS if key in data
+        }
+    tokenData["exp"] = now + ACCESS_TOKEN_LIFETIME
+    return tokenData
+
+
+def refresh_token_data(data: dict, now: datetime):
     tokenData = {}
     tokenData["id"] = data["id"]
     tokenData["email"] = data["email"]
-    tokenData["exp"] = datetime.now(tz=timezone.utc) + timedelta(days=30)
+    tokenData["modified"] = data.get("modified")
+    tokenData["exp"] = now + REFRESH_TOKEN_LIFETIME
     tokenData["refresh_token"] = True
-    return create_jwt(tokenData)
+    return tokenData
+
+
+def issue_tokens(data: dict):
+    """
+    Mint the access and refresh tokens of a user in one pass.
+    """
+    keyring = get_keyring()
+    now = datetime.now(tz=timezone.utc)
+    return {
+        "access_token": keyring.sign(access_token_data(data, now)),
+        "refresh_token": keyring.sign(refresh_token_data(data, now)),
+    }
 
 
 def create_verification_token(email: str):
     data = {
         "email": email,
-        "exp": datetime.now(tz=timezone.utc) + timedelta(minutes=5),
+        "exp": datetime.now(tz=timezone.utc) + VERIFICATION_TOKEN_LIFETIME,
     }
     return create_jwt(data)
 
 
 def create_jwt(data: dict):
-    secret = get_env("JWT_SECRET")
-    return jwt.encode(data, secret, algorithm="HS256")
+    return get_keyring().sign(data)
 
 
 def send_email(to, subject, template, data):
@@ -62,8 +121,7 @@ def send_email(to, subject, template, data):
 
 def decode_token(token):
     try:
-        secret = get_env("JWT_SECRET")
-        token = jwt.decode(token, secret, algorithms=["HS256"])
+        token = get_keyring().decode(token)
     except jwt.ExpiredSignatureError:
         return False
     except jwt.InvalidTokenError:
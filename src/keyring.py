@@ -0,0 +1,148 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+from calendar import timegm
+from datetime import datetime
+import jwt
+from src.constants import DEFAULT_JWT_KID
+
+
+def base64url_encode(data: bytes):
+    return base64.urlsafe_b64encode(data).replace(b"=", b"")
+
+
+def encode_claims(claims: dict):
+    # Same serialization as jwt.encode: datetimes become epoch seconds.
+    claims = {
+        key: timegm(value.utctimetuple())
+        if isinstance(value, datetime)
+        else value
+        for key, value in claims.items()
+    }
+    return base64url_encode(
+        json.dumps(claims, separators=(",", ":")).encode()
+    )
+
+
+def parse_keys(keys: str):
+    """
+    Parse ``kid:secret,kid:secret`` into a dict, ignoring whitespace around
+    entries and empty entries. Errors never include the secrets.
+    """
+    secrets = {}
+    for position, entry in enumerate(keys.split(","), start=1):
+        if not entry.strip():
+            continue
+        kid, separator, secret = entry.partition(":")
+        kid, secret = kid.strip(), secret.strip()
+        if not separator or not kid or not secret:
+            raise ValueError(
+                f"JWT_KEYS entry {position} must be formatted as kid:secret"
+            )
+        if kid in secrets:
+            raise ValueError(f"JWT_KEYS defines key {kid!r} twice")
+        secrets[kid] = secret
+    if not secrets:
+        raise ValueError("JWT_KEYS does not define any key")
+    return secrets
+
+
+class SigningKey:
+    """
+    HS256 key with its JWS header segment and HMAC state precomputed, so
+    minting a token is one ``hmac.copy`` plus the claims serialization.
+    """
+
+    def __init__(self, kid: str, secret: str):
+        self.kid = kid
+        self.secret = secret.encode()
+        header = {"alg": "HS256", "kid": kid, "typ": "JWT"}
+        self.header = base64url_encode(
+            json.dumps(header, separators=(",", ":")).encode()
+        )
+        self._hmac = hmac.new(self.secret, digestmod=hashlib.sha256)
+
+    def sign(self, claims: dict):
+        signing_input = self.header + b"." + encode_claims(claims)
+        signature = self._hmac.copy()
+        signature.update(signing_input)
+        return (
+            signing_input + b"." + base64url_encode(signature.digest())
+        ).decode()
+
+
+class Keyring:
+    """
+    JWT keys of the container: one active key signs new tokens, every key
+    verifies them, so a secret can be rotated by first adding the new key,
+    then making it active, then dropping the old one.
+    """
+
+    def __init__(self, secrets: dict, active_kid: str):
+        if active_kid not in secrets:
+            raise ValueError(f"Active JWT key {active_kid!r} is not defined")
+        self.keys = {
+            kid: SigningKey(kid, secret) for kid, secret in secrets.items()
+        }
+        self.active = self.keys[active_kid]
+
+    @classmethod
+    def from_env(cls):
+        """
+        Load ``JWT_KEYS`` (``kid:secret,kid:secret``) and ``JWT_ACTIVE_KID``,
+        or fall back to a single ``JWT_SECRET`` key. Raise when neither is
+        set rather than sign tokens with a guessable secret.
+        """
+        keys = os.environ.get("JWT_KEYS")
+        if not keys:
+            secret = os.environ.get("JWT_SECRET")
+            if not secret:
+                raise ValueError("JWT_SECRET or JWT_KEYS must be set")
+            return cls({DEFAULT_JWT_KID: secret}, DEFAULT_JWT_KID)
+
+        secrets = parse_keys(keys)
+        active_kid = os.environ.get("JWT_ACTIVE_KID") or next(iter(secrets))
+        return cls(secrets, active_kid)
+
+    def sign(self, claims: dict):
+        return self.active.sign(claims)
+
+    def decode(self, token: str):
+        """
+        Verify ``token`` with the key named by its ``kid`` header and return
+        its claims. Tokens without ``kid`` are checked against every key.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is not None:
+            if kid not in self.keys:
+                raise jwt.InvalidTokenError(f"Unknown JWT key {kid!r}")
+            keys = [self.keys[kid]]
+        else:
+            keys = list(self.keys.values())
+
+        for key in keys[:-1]:
+            try:
+                return jwt.decode(token, key.secret, algorithms=["HS256"])
+            except jwt.InvalidSignatureError:
+                pass
+        return jwt.decode(token, keys[-1].secret, algorithms=["HS256"])
+
+
+_keyring = None
+
+
+def get_keyring():
+    """
+    Keyring of the container, loaded on first use (after .env is loaded).
+    """
+    global _keyring
+    if _keyring is None:
+        _keyring = Keyring.from_env()
+    return _keyring
+
+
+def reset_keyring():
+    global _keyring
+    _keyring = None
@@ -7,17 +7,24 @@ import sentry_sdk
 from fastapi import FastAPI, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
-from src.auth import make_password, check_password
-from src.models import Users
 from pynamodb.exceptions import DoesNotExist
-from src.api import users
 from dotenv import load_dotenv
 
-
+# Before the src imports, which read their settings at import time.
 load_dotenv()
+
+from src.auth import make_password, check_password  # noqa: E402
+from src.models import Users  # noqa: E402
+from src.api import users  # noqa: E402
+from src.keyring import get_keyring  # noqa: E402
+
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Fail on startup, not on the first token, when no JWT key is configured.
+get_keyring()
+
 stage = os.environ.get("STAGE", None)
 openapi_prefix = f"/{stage}" if stage else None
 
@@ -58,33 +65,35 @@ def health():
 
 
 @app.post("/users/signup")
-def create_user(data: dict):
-    return users.create_user(data)
+async def create_user(data: dict):
+    return await users.create_user(data)
 
 
 @app.post("/users/login")
-def login_user(data: dict):
-    return users.login_user(data)
+async def login_user(data: dict):
+    return await users.login_user(data)
 
 
 @app.post("/users/reset")
-def token_reset_send(data: dict):
-    return users.reset_password_email(data)
+async def token_reset_send(data: dict):
+    return await users.reset_password_email(data)
 
 
 @app.patch("/users/reset")
-def token_reset(data: dict):
-    return users.reset_password(data)
+async def token_reset(data: dict):
+    return await users.reset_password(data)
 
 
 @app.post("/token/verify")
-def token_verify(data: dict):
-    return users.verify_token(token=data["token"])
+async def token_verify(data: dict):
+    return await users.verify_token(token=data["token"])
 
 
 @app.post("/token/refresh")
-def token_verify(data: dict):
-    return users.refresh_token(token=data["token"])
+async def token_verify(data: dict):
+    return await users.refresh_token(token=data["token"])
 
 
-handler = Mangum(app)
+# Mangum runs the lifespan on every invocation, keep it off so the DynamoDB
+# client and its connection pool survive across invocations.
+handler = Mangum(app, lifespan="off")
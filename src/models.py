@@ -8,6 +8,7 @@ from pynamodb.attributes import (
 from datetime import datetime
 import json
 
+from pynamodb.indexes import GlobalSecondaryIndex, KeysOnlyProjection
 from pynamodb.models import Model
 
 
@@ -40,10 +41,27 @@ class BaseModel(Model):
             return attr
 
 
+class CreatedDayIndex(GlobalSecondaryIndex):
+    """
+    Users by UTC creation day, to read the users created since a timestamp
+    without scanning the table.
+    """
+
+    class Meta:
+        index_name = "created_day_index"
+        projection = KeysOnlyProjection()
+        read_capacity_units = 1
+        write_capacity_units = 1
+
+    created_day = UnicodeAttribute(hash_key=True)
+    created_at = NumberAttribute(range_key=True)
+
+
 class Users(BaseModel):
     class Meta:
         table_name = os.environ.get("USERS_TABLE", "example-users")
         region = os.environ.get("REGION", "eu-west-3")
+        host = os.environ.get("DYNAMODB_HOST")
 
     id = UnicodeAttribute()
     email = UnicodeAttribute(hash_key=True)
@@ -56,5 +74,8 @@ class Users(BaseModel):
     city = UnicodeAttribute()
     address = UnicodeAttribute()
     created_at = NumberAttribute()
+    created_day = UnicodeAttribute(null=True)
     modified = NumberAttribute()
     utms = MapAttribute()
+
+    created_day_index = CreatedDayIndex()
@@ -0,0 +1,54 @@
+import os
+import time
+from collections import OrderedDict
+
+
+class ProfileCache:
+    """
+    Per-container LRU cache of user profiles (``to_dict`` without password)
+    keyed by email and versioned by their ``modified`` timestamp.
+
+    Refresh tokens carry the ``modified`` of the profile they were issued
+    for, so a refresh can reuse the cached profile when both versions match
+    instead of reading the user from DynamoDB. Entries expire after
+    ``ttl_seconds`` to bound staleness across containers.
+    """
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.reset()
+
+    def reset(self):
+        self._profiles = OrderedDict()
+
+    def put(self, user: dict):
+        if self.max_size <= 0:
+            return
+        self._profiles[user["email"]] = (time.monotonic(), dict(user))
+        self._profiles.move_to_end(user["email"])
+        while len(self._profiles) > self.max_size:
+            self._profiles.popitem(last=False)
+
+    def get(self, email, modified):
+        """
+        Return the cached profile of ``email`` if it is still fresh and its
+        version is ``modified``, None otherwise.
+        """
+        entry = self._profiles.get(email)
+        if entry is None or modified is None:
+            return None
+        cached_at, user = entry
+        if time.monotonic() - cached_at > self.ttl_seconds:
+            del self._profiles[email]
+            return None
+        if user.get("modified") != modified:
+            return None
+        self._profiles.move_to_end(email)
+        return dict(user)
+
+
+profiles = ProfileCache(
+    max_size=int(os.environ.get("PROFILE_CACHE_SIZE", 10000)),
+    ttl_seconds=int(os.environ.get("PROFILE_CACHE_SECONDS", 300)),
+)
@@ -1,8 +1,12 @@
 # conftest.py
+import asyncio
 import pytest
 import os
 import shutil
 from src.models import Users
+from src import db
+from src.bloom import emails
+from src.profiles import profiles
 import pytest
 from fastapi.testclient import TestClient
 from src.main import app
@@ -31,6 +35,8 @@ def create_user2():
 def run_before_and_after_tests():
     print("Init tests")
     clean_users()
+    emails.reset()
+    profiles.reset()
 
     yield  # this is where the testing happens
 
@@ -38,6 +44,12 @@ def run_before_and_after_tests():
     clean_users()
 
 
+@pytest.fixture(autouse=True, scope="session")
+def close_db_client():
+    yield
+    asyncio.get_event_loop().run_until_complete(db.close_client())
+
+
 def clean_users():
     for item in Users.scan():
         item.delete()
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src.bloom import BloomFilter, EmailFilter
+from src.main import app
+from tests.constants import USER1, USER2
+
+client = TestClient(app)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000)
+    emails = [f"user{i}@example.com" for i in range(1000)]
+    for email in emails:
+        bloom.add(email)
+
+    assert all(email in bloom for email in emails)
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.add(f"user{i}@example.com")
+
+    false_positives = sum(
+        f"other{i}@example.com" in bloom for i in range(10000)
+    )
+    assert false_positives / 10000 < 0.02
+
+
+def test_bloom_filter_size_at_10m_users():
+    bloom = BloomFilter(capacity=10_000_000, error_rate=0.01)
+    assert bloom.hashes == 7
+    assert len(bloom.bits) < 12 * 1024 * 1024
+
+
+def test_email_filter_disabled_allocates_nothing():
+    emails = EmailFilter(1000, 0.01, 1, 300, enabled=False)
+    assert emails.filter is None
+    assert emails.might_exist("test@example.com")
+
+
+def test_email_filter_loads_and_refreshes(create_user1):
+    loop = asyncio.get_event_loop()
+    emails = EmailFilter(1000, 0.01, 2, 300, enabled=True)
+    assert emails.might_exist(USER1["email"])
+
+    loop.run_until_complete(emails._task)
+    assert emails.loaded_at is not None
+    assert emails.might_exist(USER1["email"])
+    assert not emails.might_exist(USER2["email"])
+
+    client.post("/users/signup", json=USER2)
+    emails.loaded_at -= 301
+    assert not emails.might_exist(USER2["email"])
+    loop.run_until_complete(emails._task)
+    assert emails.might_exist(USER2["email"])
+
+
+def test_email_filter_reset_cancels_load():
+    loop = asyncio.get_event_loop()
+    emails = EmailFilter(1000, 0.01, 1, 300, enabled=True)
+    emails.might_exist(USER1["email"])
+    task = emails._task
+
+    emails.reset()
+    with pytest.raises(asyncio.CancelledError):
+        loop.run_until_complete(task)
+    assert emails.loaded_at is None
+
+
+def test_email_filter_failed_load_is_retried_after_refresh(mocker):
+    loop = asyncio.get_event_loop()
+    scan_emails = mocker.patch(
+        "src.bloom.db.scan_emails", side_effect=RuntimeError("throttled")
+    )
+    emails = EmailFilter(1000, 0.01, 1, 300, enabled=True)
+    for _ in range(5):
+        assert emails.might_exist(USER1["email"])
+        loop.run_until_complete(emails._task)
+    assert scan_emails.call_count == 1
+    assert emails.loaded_at is None
+
+    emails.failed_at -= 301
+    emails.might_exist(USER1["email"])
+    loop.run_until_complete(emails._task)
+    assert scan_emails.call_count == 2
@@ -0,0 +1,22 @@
+import asyncio
+import pytest
+from src import db
+
+
+def test_get_client_retries_after_failed_creation(mocker):
+    client = object()
+    create = mocker.patch.object(
+        db,
+        "_create_client",
+        side_effect=[ConnectionError("credentials"), (None, client)],
+    )
+    loop = asyncio.new_event_loop()
+    try:
+        with pytest.raises(ConnectionError):
+            loop.run_until_complete(db.get_client())
+        assert loop.run_until_complete(db.get_client()) is client
+        assert loop.run_until_complete(db.get_client()) is client
+        assert create.call_count == 2
+    finally:
+        db._clients.pop(loop, None)
+        loop.close()
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+import jwt
+import pytest
+from src.constants import DEFAULT_JWT_KID
+from src.keyring import Keyring, parse_keys
+
+CLAIMS = {"id": "1", "email": "test@example.com", "account_type": 2}
+
+
+def claims():
+    return {**CLAIMS, "exp": datetime.now(tz=timezone.utc) + timedelta(1)}
+
+
+def test_signed_token_matches_pyjwt():
+    keyring = Keyring({"a": "secret-a"}, "a")
+    token = keyring.sign(claims())
+
+    assert jwt.get_unverified_header(token)["kid"] == "a"
+    decoded = jwt.decode(token, "secret-a", algorithms=["HS256"])
+    assert decoded["email"] == CLAIMS["email"]
+    assert isinstance(decoded["exp"], int)
+
+
+def test_rotation_verifies_tokens_of_every_key():
+    old = Keyring({"a": "secret-a"}, "a")
+    token = old.sign(claims())
+
+    rotated = Keyring({"a": "secret-a", "b": "secret-b"}, "b")
+    assert rotated.decode(token)["email"] == CLAIMS["email"]
+    assert jwt.get_unverified_header(rotated.sign(claims()))["kid"] == "b"
+
+    with pytest.raises(jwt.InvalidTokenError):
+        Keyring({"b": "secret-b"}, "b").decode(token)
+
+
+def test_tokens_without_kid_are_verified():
+    token = jwt.encode(claims(), "secret-a", algorithm="HS256")
+    keyring = Keyring({"a": "secret-a", "b": "secret-b"}, "b")
+    assert keyring.decode(token)["email"] == CLAIMS["email"]
+
+    with pytest.raises(jwt.InvalidSignatureError):
+        Keyring({"b": "secret-b"}, "b").decode(token)
+
+
+def test_expired_token():
+    keyring = Keyring({"a": "secret-a"}, "a")
+    token = keyring.sign(
+        {**CLAIMS, "exp": datetime.now(tz=timezone.utc) - timedelta(1)}
+    )
+    with pytest.raises(jwt.ExpiredSignatureError):
+        keyring.decode(token)
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv("JWT_KEYS", raising=False)
+    monkeypatch.setenv("JWT_SECRET", "secret-a")
+    keyring = Keyring.from_env()
+    assert keyring.active.kid == DEFAULT_JWT_KID
+    assert keyring.active.secret == b"secret-a"
+
+    monkeypatch.setenv("JWT_KEYS", " a:secret-a, b:secret:b ,")
+    monkeypatch.setenv("JWT_ACTIVE_KID", "b")
+    keyring = Keyring.from_env()
+    assert set(keyring.keys) == {"a", "b"}
+    assert keyring.active.secret == b"secret:b"
+
+
+def test_from_env_without_keys(monkeypatch):
+    monkeypatch.delenv("JWT_KEYS", raising=False)
+    monkeypatch.delenv("JWT_SECRET", raising=False)
+    with pytest.raises(ValueError, match="JWT_SECRET or JWT_KEYS"):
+        Keyring.from_env()
+
+
+@pytest.mark.parametrize("keys", ["a:x,b", "a:x,:y", "a:", ",", "a:x,a:y"])
+def test_malformed_keys(keys):
+    with pytest.raises(ValueError, match="JWT_KEYS"):
+        parse_keys(keys)
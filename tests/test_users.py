@@ -3,8 +3,17 @@ from datetime import datetime, timedelta, timezone
 import pytest
 from fastapi.testclient import TestClient
 from src.main import app
-from src.helpers import send_email, get_secrets, decode_token
-from tests.constants import USER1
+from src import db
+from src.bloom import emails
+from src.profiles import profiles
+from src import helpers
+from src.helpers import (
+    send_email,
+    decode_token,
+    access_token_claims,
+    create_verification_token,
+)
+from tests.constants import USER1, USER2
 from unittest.mock import MagicMock
 from freezegun import freeze_time
 
@@ -18,6 +27,8 @@ def test_health():
         "stage": None,
         "success": True,
         "region": None,
+        "MAILGUN_BASE_URL": None,
+        "SENTRY": None,
     }
 
 
@@ -150,3 +161,117 @@ def test_refresh_token(create_user1):
         )
         assert response.status_code == 200
         assert response.json() is False
+
+
+def test_login_unknown_user():
+    response = client.post(
+        "/users/login",
+        json={
+            "email": USER1["email"],
+            "password": USER1["password"],
+        },
+    )
+    assert response.status_code == 404
+
+
+def test_signup_duplicate_with_stale_email_filter(create_user1, mocker):
+    # A filter that missed a signup must not allow a duplicate user.
+    mocker.patch("src.api.users.emails.might_exist", return_value=False)
+    response = client.post(
+        "/users/signup",
+        json=USER1,
+    )
+    assert response.status_code == 409
+
+
+def test_login_does_not_use_email_filter(create_user1, mocker):
+    # A signup from another container is not in this filter until its next
+    # refresh, so login must always read the user.
+    might_exist = mocker.spy(emails, "might_exist")
+    response = client.post(
+        "/users/login",
+        json={
+            "email": USER1["email"],
+            "password": USER1["password"],
+        },
+    )
+    assert response.status_code == 200
+    might_exist.assert_not_called()
+
+
+def test_minimal_access_token(monkeypatch):
+    monkeypatch.setattr(
+        helpers, "ACCESS_TOKEN_CLAIM_KEYS", access_token_claims("minimal")
+    )
+    response = client.post(
+        "/users/signup",
+        json=USER1,
+    )
+    assert response.status_code == 200
+
+    access_token = decode_token(response.json()["access_token"])
+    assert access_token["email"] == USER1["email"]
+    assert access_token["account_type"] == USER1["account_type"]
+    assert "first_name" not in access_token
+    assert "password" not in access_token
+
+
+def test_refresh_token_uses_cached_profile(create_user1, mocker):
+    get_user = mocker.spy(db, "get_user")
+    response = client.post(
+        "/token/refresh",
+        json={
+            "token": create_user1.json()["refresh_token"],
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == USER1["email"]
+    assert "access_token" in response.json()
+    get_user.assert_not_called()
+
+
+def test_unknown_access_token_claims():
+    with pytest.raises(ValueError, match="ACCESS_TOKEN_CLAIMS"):
+        access_token_claims("everything")
+
+
+def test_refresh_token_reads_uncached_profile(create_user1, mocker):
+    profiles.reset()
+    get_user = mocker.spy(db, "get_user")
+    response = client.post(
+        "/token/refresh",
+        json={
+            "token": create_user1.json()["refresh_token"],
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == USER1["email"]
+    get_user.assert_called_once()
+
+
+def test_refresh_token_reads_changed_profile(create_user1, mocker):
+    signup = create_user1.json()
+    response = client.patch(
+        "/users/reset",
+        json={
+            "email": USER1["email"],
+            "password": "654321",
+            "token": create_verification_token(USER1["email"]),
+        },
+    )
+    assert response.status_code == 200
+    modified = response.json()["user"]["modified"]
+    assert modified != signup["user"]["modified"]
+
+    get_user = mocker.spy(db, "get_user")
+    response = client.post(
+        "/token/refresh",
+        json={
+            "token": signup["refresh_token"],
+        },
+    )
+    assert response.status_code == 200
+    get_user.assert_called_once()
+    assert response.json()["user"]["modified"] == modified
+    refresh_token = decode_token(response.json()["refresh_token"])
+    assert refresh_token["modified"] == modified